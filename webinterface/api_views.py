@@ -50,7 +50,8 @@ class CleanerViewSet(ModelViewSet):
     @action(detail=True, methods=['GET'])
     def acceptable_dutyswitch(self, request, slug):
         cleaner = get_object_or_404(Cleaner, slug=slug)
-        open_dutyswitch = DutySwitch.objects.open().all()
+        open_dutyswitch = DutySwitch.objects.open().select_related(
+            'requester_assignment__cleaner', 'requester_assignment__schedule', 'requester_assignment__cleaning_week')
         acceptable = [x for x in open_dutyswitch if x.possible_acceptors().filter(cleaner=cleaner).exists()]
         serializer = DutySwitchSerializer(acceptable, many=True, context={'request': request})
         return Response(serializer.data)
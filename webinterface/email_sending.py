@@ -111,15 +111,16 @@ def send_email__dutyswitch_complete(dutyswitch):
 def send_email__assignment_coming_up(notify_days_before=5):
     from webinterface.models import Cleaner, current_epoch_week
     outbox = []
+    this_week = current_epoch_week()
+    notify_on_assignment_date = timezone.now().date() + timezone.timedelta(days=notify_days_before)
+    template = get_template('email_templates/email_assignment_coming_up.md')
     for cleaner in Cleaner.objects.has_email().filter(email_pref_assignment_coming_up=True):
         assignments = cleaner.assignment_set.in_enabled_cleaning_weeks().\
-            filter(cleaning_week__week__range=(current_epoch_week(), current_epoch_week()+1))
+            filter(cleaning_week__week__range=(this_week, this_week+1))
 
-        notify = [x for x in assignments.all()
-                  if x.assignment_date()-timezone.timedelta(days=notify_days_before) == timezone.now().date()]
+        notify = [x for x in assignments.all() if x.assignment_date() == notify_on_assignment_date]
 
         for assignment in notify:
-            template = get_template('email_templates/email_assignment_coming_up.md')
             context = {  # for base_template, context MUST contain cleaner and host
                 'cleaner': cleaner,
                 'host': HOST,
@@ -150,7 +151,8 @@ def send_email__warn_admin_assignments_running_out():
 
 def send_email__warn_admin_cleaner_soon_homeless():
     from webinterface.models import Cleaner
-    cleaners_with_warning = [x for x in Cleaner.objects.all() if x.is_homeless_soon(less_than_equal=False)]
+    cleaners_with_warning = [x for x in Cleaner.objects.prefetch_related('affiliation_set')
+                             if x.is_homeless_soon(less_than_equal=False)]
     # less_than_equal=False prevents the email being sent every week for the same Cleaner
     if cleaners_with_warning:
         outbox = []
@@ -166,11 +168,13 @@ def send_email__warn_admin_cleaner_soon_homeless():
 def send_email__warn_admin_tasks_forgotten():
     from webinterface.models import CleaningWeek, current_epoch_week
     this_week = current_epoch_week()
+    today = timezone.now().date()
+    yesterday = today - timezone.timedelta(days=1)
     relevant_cleaning_weeks = CleaningWeek.objects.filter(week__range=(this_week-1, this_week))
-    for cleaning_week in relevant_cleaning_weeks.all():
-        if all([task.has_passed() for task in cleaning_week.task_set.all()]) \
-                and any([task.end_date() + timezone.timedelta(days=1) == timezone.now().date()
-                         for task in cleaning_week.task_set.all()]):
+    for cleaning_week in relevant_cleaning_weeks.select_related('schedule'):
+        tasks = list(cleaning_week.task_set.select_related('template'))
+        if all([task.has_passed(today=today) for task in tasks]) \
+                and any([task.end_date() == yesterday for task in tasks]):
             ratio = cleaning_week.ratio_of_completed_tasks()
             if ratio == 0.0:
                 # No Task was completed
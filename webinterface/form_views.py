@@ -1,5 +1,5 @@
 from .forms import *
-from django.urls import reverse_lazy, reverse
+from django.urls import reverse_lazy
 from django.views.generic.edit import CreateView, DeleteView, UpdateView, FormView
 from django.http import HttpResponseRedirect
 from django.http import Http404, HttpResponseForbidden
@@ -510,7 +510,7 @@ class TaskTemplateNewView(CreateView):
                                           "<span class=\"glyphicon glyphicon-menu-right\"></span>"
                                           "'<span class=\"glyphicon glyphicon-plus\"></span> "
                                           "Aufgaben aktualisieren'".format(
-                                            self.schedule, Schedule.WEEKDAYS[self.schedule.weekday][1])}
+                                            self.schedule, self.schedule.weekday_as_name())}
         context['submit_button'] = {'text': "Speichern"}
         context['cancel_button'] = {'text': "Abbrechen",
                                     'url': self.success_url}
@@ -542,7 +542,7 @@ class TaskTemplateUpdateView(UpdateView):
         context['title'] = "Bearbeite Aufgabe"
         context['info_banner'] = {'text': "Diese Aufgabe gehört zum Putzplan <strong>{}</strong>, "
                                           "welcher sich jeden <strong>{}</strong> wiederholt".format(
-                                            self.object.schedule, Schedule.WEEKDAYS[self.object.schedule.weekday][1])}
+                                            self.object.schedule, self.object.schedule.weekday_as_name())}
         context['submit_button'] = {'text': "Speichern"}
         context['cancel_button'] = {'text': "Abbrechen",
                                     'url': reverse_lazy('webinterface:schedule-task-list',
@@ -577,10 +577,10 @@ class TaskCreateView(FormView):
 
     @staticmethod
     def create_ul_of_task_templates(templates):
-        task_list = ['<li>' + x.name + '</li>' for x in templates]
+        task_list = [f'<li>{x.name}</li>' for x in templates]
         if len(task_list) == 0:
             return '<i>Keine Aufgaben</i>'
-        return '<ul>' + ''.join(task_list) + '</ul>'
+        return f"<ul>{''.join(task_list)}</ul>"
 
     def dispatch(self, request, *args, **kwargs):
         try:
@@ -652,8 +652,8 @@ class TaskCleanedView(UpdateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = "Setze eine Aufgabe als 'geputzt'"
-        context['info_banner'] = {'text': "<p><strong>Gespeicherter Hilfetext:</strong></p><p>" +
-                                          self.object.template.help_text + "</p>"}
+        context['info_banner'] = {'text': "<p><strong>Gespeicherter Hilfetext:</strong></p>"
+                                          f"<p>{self.object.template.help_text}</p>"}
         context['submit_button'] = {'text': "Speichern"}
         context['cancel_button'] = {'text': "Abbrechen",
                                     'url': self.success_url}
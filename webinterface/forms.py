@@ -47,10 +47,11 @@ class ScheduleForm(forms.ModelForm):
                                  required=False)
 
     def __init__(self, *args, **kwargs):
-        initial = kwargs.get('initial', {})
-        if 'instance' in kwargs and kwargs['instance']:
-            initial['schedule_group'] = ScheduleGroup.objects.filter(schedules=kwargs['instance'])
-            kwargs['initial'] = initial
+        instance = kwargs.get('instance')
+        if instance:
+            # Left unevaluated, so it is only queried when an unbound form is rendered
+            kwargs.setdefault('initial', {})['schedule_group'] = \
+                ScheduleGroup.objects.filter(schedules=instance).values_list('pk', flat=True)
         super().__init__(*args, **kwargs)
 
 
@@ -98,12 +99,13 @@ class CleanerForm(forms.ModelForm):
     email = forms.EmailField(label="Email-Adresse", required=False)
 
     def __init__(self, request=None, *args, **kwargs):
+        instance = kwargs.get('instance')
         super().__init__(*args, **kwargs)
 
-        if 'instance' in kwargs and kwargs['instance']:
+        if instance:
             # We are in the UpdateView
-            self.fields['email'].initial = kwargs['instance'].user.email
-            cleaner = kwargs['instance'].name
+            self.fields['email'].initial = instance.user.email
+            cleaner = instance.name
         else:
             cleaner = "der Putzende"
 
@@ -151,32 +153,33 @@ class AffiliationForm(forms.ModelForm):
     def clean(self):
         cleaned_data = super().clean()
 
-        pk = self.instance.pk
-        try:
-            beginning = date_to_epoch_week(cleaned_data.get('beginning'))
-        except AttributeError:
+        beginning = cleaned_data.get('beginning')
+        if beginning is None:
             raise ValidationError("Beginn muss im korrekten Datumsformat sein!")
-        try:
-            end = date_to_epoch_week(cleaned_data.get('end'))
-        except AttributeError:
+        end = cleaned_data.get('end')
+        if end is None:
             raise ValidationError("Ende muss im korrekten Datumsformat sein!")
 
-        Affiliation.date_validator(affiliation_pk=pk, cleaner=self.cleaner, beginning=beginning, end=end)
+        Affiliation.date_validator(affiliation_pk=self.instance.pk, cleaner=self.cleaner,
+                                   beginning=date_to_epoch_week(beginning), end=date_to_epoch_week(end))
         return cleaned_data
 
     def __init__(self, cleaner=None, *args, **kwargs):
+        instance = kwargs.get('instance')
         super().__init__(*args, **kwargs)
         self.cleaner = cleaner
-        if not self.cleaner and 'instance' in kwargs and kwargs['instance']:
-            self.cleaner = kwargs['instance'].cleaner
+        if not self.cleaner and instance:
+            self.cleaner = instance.cleaner
 
-        if self.cleaner and self.cleaner.is_active():
-            self.fields['group'].initial = self.cleaner.current_affiliation().group
+        if self.cleaner:
+            current_affiliation = self.cleaner.current_affiliation()
+            if current_affiliation is not None:
+                self.fields['group'].initial = current_affiliation.group_id
 
-        if 'instance' in kwargs and kwargs['instance']:
+        if instance:
             # We are in AffiliationUpdateView
-            self.fields['beginning'].initial = kwargs['instance'].beginning_as_date
-            self.fields['end'].initial = kwargs['instance'].end_as_date
+            self.fields['beginning'].initial = instance.beginning_as_date
+            self.fields['end'].initial = instance.end_as_date
 
 
 class CleaningWeekForm(forms.ModelForm):
@@ -232,15 +235,24 @@ class AssignmentForm(forms.ModelForm):
         }
 
     def __init__(self, schedule=None, *args, **kwargs):
+        instance = kwargs.get('instance')
         super().__init__(*args, **kwargs)
-        if 'instance' in kwargs and kwargs['instance']:
-            assignment = kwargs['instance']
+        if instance:
             active_affiliations = Affiliation.objects.active_in_week_for_schedule(
-                week=assignment.cleaning_week.week, schedule=assignment.schedule)
+                week=instance.cleaning_week.week, schedule=instance.schedule)
             active_cleaners = [x.cleaner.pk for x in active_affiliations.all()]
             self.fields['cleaner'].queryset = Cleaner.objects.filter(pk__in=active_cleaners)
 
 
+# The choices of TaskTemplateForm only depend on the weekday of the Schedule, so they are built once for every weekday
+DAYS_BEFORE_CHOICES_BY_WEEKDAY = {
+    weekday: tuple((i, "{} - {} Tage davor".format(WEEKDAY_NAMES[(weekday - i) % 7], i)) for i in range(0, 7))
+    for weekday in range(0, 7)}
+DAYS_AFTER_CHOICES_BY_WEEKDAY = {
+    weekday: tuple((i, "{} - {} Tage danach".format(WEEKDAY_NAMES[(weekday + i) % 7], i)) for i in range(0, 7))
+    for weekday in range(0, 7)}
+
+
 class TaskTemplateForm(forms.ModelForm):
     class Meta:
         model = TaskTemplate
@@ -259,21 +271,17 @@ class TaskTemplateForm(forms.ModelForm):
         }
 
     def __init__(self, schedule=None, *args, **kwargs):
+        instance = kwargs.get('instance')
         super().__init__(*args, **kwargs)
 
-        if 'instance' in kwargs and kwargs['instance']:
-            schedule = kwargs['instance'].schedule
+        if instance:
+            schedule = instance.schedule
 
         self.fields['start_days_before'].initial = 0
         self.fields['end_days_after'].initial = 0
 
-        days_before = [(i, "{} - {} Tage davor".format(Schedule.WEEKDAYS[(schedule.weekday - i) % 7][1], i))
-                       for i in range(0, 7)]
-        days_after = [(i, "{} - {} Tage danach".format(Schedule.WEEKDAYS[(schedule.weekday + i) % 7][1], i))
-                      for i in range(0, 7)]
-
-        self.fields['start_days_before'].choices = days_before
-        self.fields['end_days_after'].choices = days_after
+        self.fields['start_days_before'].choices = DAYS_BEFORE_CHOICES_BY_WEEKDAY[schedule.weekday]
+        self.fields['end_days_after'].choices = DAYS_AFTER_CHOICES_BY_WEEKDAY[schedule.weekday]
 
 
 class TaskCleanedForm(forms.ModelForm):
@@ -285,12 +293,13 @@ class TaskCleanedForm(forms.ModelForm):
         }
 
     def __init__(self, logged_in_cleaner=None, *args, **kwargs):
+        instance = kwargs.get('instance')
         if logged_in_cleaner is not None:
             kwargs['initial'] = {'cleaned_by': logged_in_cleaner}
         super().__init__(*args, **kwargs)
         self.fields['cleaned_by'].empty_label = '--- nicht erledigt ---'
-        if 'instance' in kwargs and kwargs['instance']:
-            self.fields['cleaned_by'].queryset = kwargs['instance'].possible_cleaners()
+        if instance:
+            self.fields['cleaned_by'].queryset = instance.possible_cleaners()
             self.fields['cleaned_by'].required = False
 
 
@@ -319,19 +328,23 @@ class DutySwitchForm(forms.ModelForm):
         }
 
     def __init__(self, requester_assignment=None, *args, **kwargs):
-        if 'instance' in kwargs and kwargs['instance']:
-            requester_assignment = kwargs['instance'].requester_assignment
+        instance = kwargs.get('instance')
+        if instance:
+            requester_assignment = instance.requester_assignment
 
         super().__init__(*args, **kwargs)
-        if 'instance' in kwargs and kwargs['instance']:
+        if instance:
             self.fields['proposed_acceptor'].widget = forms.HiddenInput()
 
         if requester_assignment:
-            self.fields['acceptor_weeks'].queryset = DutySwitch.default_acceptor_weeks(requester_assignment)
-            self.fields['acceptor_weeks'].initial = self.fields['acceptor_weeks'].queryset
+            # The labels of the choices access related objects, which select_related() fetches in the same query
+            self.fields['acceptor_weeks'].queryset = \
+                DutySwitch.default_acceptor_weeks(requester_assignment).select_related('schedule')
+            self.fields['acceptor_weeks'].initial = self.fields['acceptor_weeks'].queryset.values_list('pk', flat=True)
 
             self.fields['proposed_acceptor'].queryset = \
-                DutySwitch.possible_acceptors_of_assignment(requester_assignment)
+                DutySwitch.possible_acceptors_of_assignment(requester_assignment).\
+                select_related('cleaner', 'cleaning_week__schedule')
 
     def clean(self):
         cleaned_data = super().clean()
@@ -355,26 +368,31 @@ class DutySwitchAcceptForm(forms.ModelForm):
         }
 
     def __init__(self, cleaner=None, *args, **kwargs):
+        instance = kwargs.get('instance')
         super().__init__(*args, **kwargs)
 
-        if 'instance' in kwargs and kwargs['instance']:
+        if instance:
             self.fields['acceptor_assignment'].queryset = \
-                kwargs['instance'].possible_acceptors().filter(cleaner=cleaner)
+                instance.possible_acceptors().filter(cleaner=cleaner).\
+                select_related('cleaner', 'cleaning_week__schedule')
 
 
 class AuthFormWithSubmit(AuthenticationForm):
+    # All instances share the helper. Rendering the Submit button overwrites its value with the value rendered as a
+    # template against the current context, so the shared layout must not contain context-dependent button values.
+    helper = FormHelper()
+    helper.layout = Layout(
+        'username',
+        'password',
+        Submit('login', 'Einloggen', css_class="btn btn-block"),
+    )
+
     def __init__(self, request=None, *args, **kwargs):
-        initial = kwargs.get('initial', {})
-        if 'username' in request.GET and request.GET['username']:
-            initial['username'] = request.GET['username']
-        kwargs['initial'] = initial
+        initial = kwargs.setdefault('initial', {})
+        username = request.GET.get('username')
+        if username:
+            initial['username'] = username
         super().__init__(request, *args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            'username',
-            'password',
-            Submit('login', 'Einloggen', css_class="btn btn-block"),
-        )
 
         if 'username' in kwargs['initial']:
             self.fields['username'].disabled = True
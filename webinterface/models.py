@@ -1,7 +1,10 @@
 from django.db import models
 from django.core.exceptions import *
+from django.db.models import Count, Q
 from django.db.models.query import QuerySet
-from operator import itemgetter
+from operator import itemgetter, attrgetter
+from bisect import bisect_right
+from itertools import groupby
 import datetime
 from django.contrib.auth.hashers import make_password
 from django.utils.text import slugify
@@ -9,34 +12,55 @@ import logging
 from logging.config import dictConfig
 from django.contrib.auth.models import User
 from django.utils import timezone
-import calendar
+from django.utils.functional import cached_property
 import random
-import time
 import os
 from cleansys.settings import WARN_WEEKS_IN_ADVANCE__ASSIGNMENTS_RUNNING_OUT, LOGGING, LOGGING_PATH, MEDIA_ROOT, \
     WARN_WEEKS_IN_ADVANCE__CLEANER_SOON_HOMELESS
 from webinterface import email_sending
 
 
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
 def date_to_epoch_week(date: datetime.date) -> int:
-    epoch_seconds = calendar.timegm(date.timetuple())
-    return int(((epoch_seconds / 60 / 60 / 24) + 3) / 7)
+    # 1.1.1970 is a Thursday, the Monday of week 0 is 3 days earlier
+    return (date.toordinal() - EPOCH_ORDINAL + 3) // 7
 
 
 def epoch_week_to_monday(week: int) -> datetime.date:
-    epoch_seconds = ((week * 7) - 3) * 24 * 60 * 60
-    return datetime.date.fromtimestamp(time.mktime(time.gmtime(epoch_seconds)))
+    return datetime.date.fromordinal(EPOCH_ORDINAL + week * 7 - 3)
 
 
 def epoch_week_to_sunday(week: int) -> datetime.date:
-    epoch_seconds = ((week * 7) + 3) * 24 * 60 * 60
-    return datetime.date.fromtimestamp(time.mktime(time.gmtime(epoch_seconds)))
+    return datetime.date.fromordinal(EPOCH_ORDINAL + week * 7 + 3)
 
 
 def current_epoch_week():
     return date_to_epoch_week(datetime.date.today())
 
 
+def cleaners_to_choose_from(ratios: list, nr_assignments_in_week: dict, excluded_pks) -> list:
+    """
+    Of the Cleaners with the lowest deployment ratio who are not excluded, find the ones with the fewest
+    Assignments in the week, so we don't randomly choose a Cleaner who already has more Assignments than the others.
+
+    :param ratios: List of [cleaner, ratio] as returned by Schedule.deployment_ratios()
+    :param nr_assignments_in_week: Number of Assignments in the week, keyed by Cleaner pk
+    :param excluded_pks: Set of pks of the Cleaners who must not be chosen
+    :return: List of Cleaners to choose from, empty if all Cleaners are excluded
+    """
+    for _, same_ratio in groupby(sorted(ratios, key=itemgetter(1)), key=itemgetter(1)):
+        non_excluded = [cleaner for cleaner, _ in same_ratio if cleaner.pk not in excluded_pks]
+        if non_excluded:
+            fewest_assignments = min(nr_assignments_in_week.get(x.pk, 0) for x in non_excluded)
+            return [x for x in non_excluded if nr_assignments_in_week.get(x.pk, 0) == fewest_assignments]
+    return []
+
+
+WEEKDAY_NAMES = ('Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag')
+
+
 class ScheduleQuerySet(models.QuerySet):
     def enabled(self):
         return self.filter(disabled=False)
@@ -54,8 +78,7 @@ class Schedule(models.Model):
     CLEANERS_PER_DATE_CHOICES = ((1, 'Einen'), (2, 'Zwei'))
     cleaners_per_date = models.IntegerField(default=1, choices=CLEANERS_PER_DATE_CHOICES)
 
-    WEEKDAYS = ((0, 'Montag'), (1, 'Dienstag'), (2, 'Mittwoch'), (3, 'Donnerstag'),
-                (4, 'Freitag'), (5, 'Samstag'), (6, 'Sonntag'))
+    WEEKDAYS = tuple(enumerate(WEEKDAY_NAMES))
     weekday = models.IntegerField(default=6, choices=WEEKDAYS)
 
     FREQUENCY_CHOICES = ((1, 'Jede Woche'), (2, 'Gerade Wochen'), (3, 'Ungerade Wochen'))
@@ -100,7 +123,7 @@ class Schedule(models.Model):
             logging.config.dictConfig(handler_config)
 
     def weekday_as_name(self):
-        return Schedule.WEEKDAYS[self.weekday][1]
+        return WEEKDAY_NAMES[self.weekday]
 
     def assignments_are_running_out(self, weeks_ahead=WARN_WEEKS_IN_ADVANCE__ASSIGNMENTS_RUNNING_OUT):
         last_assignment = self.assignment_set.last()
@@ -115,17 +138,19 @@ class Schedule(models.Model):
     def currently_active_affiliations(self):
         return self.active_affiliations_in_week(current_epoch_week())
 
-    def constant_affiliation_timespan(self, week: int) -> dict:
+    def constant_affiliation_timespan(self, week: int, active_affiliations=None) -> dict:
         """
         Find minimal timespan during which all currently active Affiliations exist at the same time
 
         :param week: Epoch week number
+        :param active_affiliations: The Affiliations active in week, if they have already been fetched
         :return: dict with keys 'beginning' and 'end'
         """
         minimal_week_set = {}
 
-        active_affiliations = self.active_affiliations_in_week(week)
-        if active_affiliations.exists():
+        if active_affiliations is None:
+            active_affiliations = self.active_affiliations_in_week(week)
+        if active_affiliations:
 
             for affiliation in active_affiliations:
                 if not minimal_week_set:
@@ -138,52 +163,74 @@ class Schedule(models.Model):
 
         return minimal_week_set
 
-    def deployment_ratios(self, week: int) -> list:
-        """week must be a epoch week number as returned by date_to_epoch_week()"""
-        ratios = []
-
-        minimal_week_set = self.constant_affiliation_timespan(week=week)
+    def deployment_ratios(self, week: int, affiliations=None) -> list:
+        """
+        week must be a epoch week number as returned by date_to_epoch_week()
 
-        active_affiliations = Affiliation.objects.active_in_week_for_schedule(week, self)
-        if active_affiliations.exists():
-            for affiliation in active_affiliations:
-                cleaner = affiliation.cleaner
-                ratios.append([cleaner,
-                               cleaner.deployment_ratio(schedule=self,
-                                                        from_week=minimal_week_set['beginning'],
-                                                        to_week=minimal_week_set['end'])])
-            return sorted(ratios, key=itemgetter(1), reverse=False)
+        affiliations can be a list of this Schedule's Affiliations spanning more than one week (see
+        create_assignments_over_timespan()), from which the ones active in week are taken instead of querying them.
+        """
+        if affiliations is None:
+            active_affiliations = list(self.active_affiliations_in_week(week))
         else:
+            active_affiliations = [x for x in affiliations if x.beginning <= week <= x.end]
+        if not active_affiliations:
             return []
 
+        minimal_week_set = self.constant_affiliation_timespan(week=week, active_affiliations=active_affiliations)
+
+        # Same counts as Cleaner.deployment_ratio(), but for all Cleaners at once
+        assignment_counts = dict(
+            self.assignment_set.in_enabled_cleaning_weeks().filter(
+                cleaning_week__week__gte=minimal_week_set['beginning'],
+                cleaning_week__week__lte=minimal_week_set['end'],
+                cleaning_week__assignments_valid=True)
+            .order_by().values_list('cleaner').annotate(Count('pk')))
+        all_assignment_count = sum(assignment_counts.values())
+
+        ratios = []
+        for affiliation in active_affiliations:
+            cleaner = affiliation.cleaner
+            if all_assignment_count != 0:
+                ratios.append([cleaner, assignment_counts.get(cleaner.pk, 0) / all_assignment_count])
+            else:
+                ratios.append([cleaner, 0.0])
+        return sorted(ratios, key=itemgetter(1), reverse=False)
+
     def occurs_in_week(self, week: int) -> bool:
-        return self.frequency == 1 or \
-               self.frequency == 2 and week % 2 == 0 or \
-               self.frequency == 3 and week % 2 == 1
+        # Frequency 2 (even weeks) and 3 (odd weeks) have the same parity as the weeks they occur in
+        return self.frequency == 1 or (week & 1) == (self.frequency & 1)
 
-    def create_assignments_over_timespan(self, start_week: int, end_week: int) -> None:
+    def create_assignments_over_timespan(self, start_week: int, end_week: int, seed=None) -> None:
         """
         Calls create_assignment() for every week between (and including) start_week to end_week
 
         :param start_week: First week number on which a new Assignment will be created.
         :param end_week: Last week number on which a new Assignment will be created
+        :param seed: Optional seed for choosing among equally suited Cleaners, making the Assignments reproducible
         :return: None
         """
         min_week = min(start_week, end_week)
         max_week = max(start_week, end_week)
 
+        # Fetched once for the whole timespan instead of once per call to create_assignment()
+        affiliations = list(Affiliation.objects.active_in_timespan_for_schedule(min_week, max_week, self))
+        rng = random.Random(seed)
+
         for week in range(min_week, max_week + 1):
-            while self.create_assignment(week=week):
+            while self.create_assignment(week=week, affiliations=affiliations, rng=rng):
                 # This loop enables Schedules with cleaners_per_date > 1 to be handled correctly, as each
                 # call to create_assignment only assigns one Cleaner
                 pass
 
-    def create_assignment(self, week: int):
+    def create_assignment(self, week: int, affiliations=None, rng=None):
         """
         On a given epoch week, create Assignments for CleaningWeeks where there are
         ones to be created and recreate Assignments in CleaningWeeks where cleaning_week.assignments_valid==False.
 
         :param week: Epoch week number to update Assignments and Tasks on
+        :param affiliations: Optional prefetched Affiliations, passed on to deployment_ratios()
+        :param rng: Optional random.Random instance to choose the Cleaner with, the random module is used otherwise
         :return: True if Assignment was created, else False
         """
         if not self.logger:
@@ -196,9 +243,9 @@ class Schedule(models.Model):
             return False
 
         if not self.occurs_in_week(week):
-            cleaning_week_where_there_shouldnt_be_one = self.cleaningweek_set.filter(week=week)
-            if cleaning_week_where_there_shouldnt_be_one.exists():
-                cleaning_week_where_there_shouldnt_be_one.first().delete()
+            cleaning_week_where_there_shouldnt_be_one = self.cleaningweek_set.filter(week=week).first()
+            if cleaning_week_where_there_shouldnt_be_one is not None:
+                cleaning_week_where_there_shouldnt_be_one.delete()
                 self.logger.warn("CLEANING_WEEK DELETED [Code90]")
 
             self.logger.info("ABORT [Code01]: {} does not occur in this week".format(self.name))
@@ -214,7 +261,7 @@ class Schedule(models.Model):
             self.logger.info("ABORT [Code02]: All {} positions are already filled.".format(self.cleaners_per_date))
             return False
 
-        ratios = self.deployment_ratios(week)
+        ratios = self.deployment_ratios(week, affiliations=affiliations)
         if not ratios:
             self.logger.warn("ABORT [Code03]: No Cleaners affiliated on this date.")
             return False
@@ -222,38 +269,28 @@ class Schedule(models.Model):
         if self.logger.getEffectiveLevel() >= logging.INFO:
             logging_text = "All cleaners' ratios: "
             for cleaner, ratio in ratios:
-                logging_text += "{}: {}".format(cleaner.name, round(ratio, 3)) + "  "
+                logging_text += f"{cleaner.name}: {round(ratio, 3)}  "
             self.logger.info(logging_text)
 
-        # First, group by deployment_ratios
-        distinct_ratio_values = list(set(x[1] for x in ratios))
-        distinct_ratio_values.sort()
-        grouped_by_ratios = [[x[0] for x in ratios if x[1] == val] for val in distinct_ratio_values]
-        for same_ratio in grouped_by_ratios:
-            non_excluded = [x for x in same_ratio if x not in cleaning_week.excluded.all()]
-            self.logger.info(">  [{}] have the same ratio and are NOT excluded. {}".format(
-                ','.join([x.name for x in non_excluded]),
-                "(All are excluded [Code11])" if len(non_excluded) == 0 else ""))
-
-            if len(non_excluded) == 0:
-                continue
-
-            # Now, group by assignment count, so we don't randomly choose the Cleaner who has twice as many
-            # Assignments in this week as the others with the same deployment_ratio.
-            nr_assignments = list(set(x.nr_assignments_in_week(week) for x in same_ratio))
-            nr_assignments.sort()
-            grouped_by_assignment_count = [[x for x in non_excluded if x.nr_assignments_in_week(week) == count]
-                                           for count in nr_assignments]
-
-            for same_assignment_count in grouped_by_assignment_count:
-                self.logger.info(">>   [{}] have the same assignment count.".format(
-                    ','.join([x.name for x in same_assignment_count])))
-                choice = random.choice(same_assignment_count)
-                self.logger.info(">>>    SUCCESS: random.choice() chose {}. [Code21] ".format(choice.name))
-                return self.assignment_set.create(cleaner=choice, cleaning_week=cleaning_week)
-
+        # Number of Assignments each Cleaner has in this week (across all Schedules), fetched in one query
+        nr_assignments_in_week = dict(
+            Assignment.objects.in_enabled_cleaning_weeks().filter(cleaning_week__week=week)
+            .order_by().values_list('cleaner').annotate(Count('pk')))
+
+        excluded_pks = frozenset(cleaning_week.excluded.values_list('pk', flat=True))
+        if rng is None:
+            rng = random
+
+        candidates = cleaners_to_choose_from(ratios, nr_assignments_in_week, excluded_pks)
+        if candidates:
+            self.logger.info(">  [{}] have the lowest ratio, are NOT excluded and have the fewest Assignments "
+                             "in this week.".format(','.join([x.name for x in candidates])))
+            choice = rng.choice(candidates)
+            self.logger.info(">>>    SUCCESS: random.choice() chose {}. [Code21] ".format(choice.name))
+            return self.assignment_set.create(cleaner=choice, cleaning_week=cleaning_week)
         else:
-            choice = random.choice(ratios)
+            self.logger.info(">  All Cleaners are excluded. [Code11]")
+            choice = rng.choice(ratios)
             self.logger.warn("All available Cleaners are excluded. We must choose from all Cleaners. "
                              "random.choice() chose {}. [Code22]".format(choice[0]))
             return self.assignment_set.create(cleaner=choice[0], cleaning_week=cleaning_week)
@@ -264,8 +301,7 @@ class Schedule(models.Model):
 
         if self.__previous_frequency != self.frequency \
                 or self.__previous_cleaners_per_date != self.cleaners_per_date:
-            [x.set_assignments_valid_field(False)
-             for x in self.cleaningweek_set.in_future().all()]
+            self.cleaningweek_set.in_future().update(assignments_valid=False)
             self.update_previous()
 
 
@@ -326,16 +362,44 @@ class Cleaner(models.Model):
     def __str__(self):
         return self.name
 
+    def update_previous(self):
+        self.__previous_slug = self.slug
+
+    def __init__(self, *args, **kwargs):
+        super(Cleaner, self).__init__(*args, **kwargs)
+        self.update_previous()
+
+    def affiliations_are_prefetched(self) -> bool:
+        return 'affiliation_set' in getattr(self, '_prefetched_objects_cache', {})
+
+    @cached_property
+    def sorted_affiliations(self) -> tuple:
+        """
+        The prefetched Affiliations of the Cleaner sorted by beginning, along with the list of their beginnings.
+        Only used if the Cleaner was fetched with prefetch_related('affiliation_set'). Like the prefetch itself,
+        it doesn't see changes made to the Affiliations afterwards through other instances, update() or bulk writes.
+        """
+        affiliations = sorted(self.affiliation_set.all(), key=attrgetter('beginning'))
+        return [x.beginning for x in affiliations], affiliations
+
+    def forget_affiliations(self):
+        self.__dict__.pop('sorted_affiliations', None)
+        getattr(self, '_prefetched_objects_cache', {}).pop('affiliation_set', None)
+
     def affiliation_in_week(self, week):
-        try:
-            current_affiliation = self.affiliation_set.filter(
-                beginning__lte=week, end__gte=week
-            )
-            if len(current_affiliation.all()) > 1:
+        if not self.affiliations_are_prefetched():
+            affiliations = list(self.affiliation_set.filter(beginning__lte=week, end__gte=week))
+            if len(affiliations) > 1:
                 logging.error("In Cleaner.affiliation_in_week: Cleaner {} has multiple Affiliations!".format(self.name))
-            return current_affiliation.first()
-        except Affiliation.DoesNotExist:
+            return affiliations[0] if affiliations else None
+
+        beginnings, affiliations = self.sorted_affiliations
+        index = bisect_right(beginnings, week) - 1
+        if index < 0 or affiliations[index].end < week:
             return None
+        if index > 0 and affiliations[index - 1].end >= week:
+            logging.error("In Cleaner.affiliation_in_week: Cleaner {} has multiple Affiliations!".format(self.name))
+        return affiliations[index]
 
     def current_affiliation(self):
         return self.affiliation_in_week(current_epoch_week())
@@ -343,7 +407,11 @@ class Cleaner(models.Model):
     def is_homeless_soon(self, less_than_equal=True):
         current_affiliation = self.current_affiliation()
         if current_affiliation is not None:
-            if not self.affiliation_set.filter(beginning=current_affiliation.end+1).exists():
+            if self.affiliations_are_prefetched():
+                has_next_affiliation = current_affiliation.end + 1 in self.sorted_affiliations[0]
+            else:
+                has_next_affiliation = self.affiliation_set.filter(beginning=current_affiliation.end + 1).exists()
+            if not has_next_affiliation:
                 if less_than_equal:
                     return current_affiliation.end <= current_epoch_week() + \
                            WARN_WEEKS_IN_ADVANCE__CLEANER_SOON_HOMELESS
@@ -373,11 +441,7 @@ class Cleaner(models.Model):
         return self.assignment_set.in_enabled_cleaning_weeks().filter(cleaning_week__week=week).count()
 
     def assignment_in_cleaning_week(self, cleaning_week):
-        query = self.assignment_set.in_enabled_cleaning_weeks().filter(cleaning_week__pk=cleaning_week.pk)
-        if query.exists():
-            return query.first()
-        else:
-            return None
+        return self.assignment_set.in_enabled_cleaning_weeks().filter(cleaning_week__pk=cleaning_week.pk).first()
 
     def delete(self, using=None, keep_parents=False):
         super().delete(using, keep_parents)
@@ -387,14 +451,16 @@ class Cleaner(models.Model):
              update_fields=None):
         self.slug = slugify(self.name)
 
-        if not self.user:
+        if self.user_id is None:
             self.user = User.objects.create(username=self.slug, password=make_password(self.slug))
-        elif self.user.username != self.slug:
+        elif self.__previous_slug != self.slug:
+            # Hashing the password is slow, so the User is only touched when the slug has actually changed
             self.user.username = self.slug
             self.user.set_password(self.slug)
-            self.user.save()
+            self.user.save(update_fields=['username', 'password'])
 
         super().save(force_insert, force_update, using, update_fields)
+        self.update_previous()
 
 
 class AffiliationQuerySet(models.QuerySet):
@@ -402,7 +468,11 @@ class AffiliationQuerySet(models.QuerySet):
         return self.filter(beginning__lte=week, end__gte=week)
 
     def active_in_week_for_schedule(self, week, schedule):
-        return self.active_in_week(week).filter(group__schedules=schedule)
+        return self.active_in_week(week).filter(group__schedules=schedule).select_related('cleaner')
+
+    def active_in_timespan_for_schedule(self, start_week, end_week, schedule):
+        return self.filter(beginning__lte=end_week, end__gte=start_week, group__schedules=schedule).\
+            select_related('cleaner')
 
 
 class Affiliation(models.Model):
@@ -415,6 +485,7 @@ class Affiliation(models.Model):
     class Meta:
         ordering = ('-end',)
         unique_together = ('beginning', 'cleaner')
+        indexes = [models.Index(fields=['beginning', 'end'])]
 
     cleaner = models.ForeignKey(Cleaner, on_delete=models.CASCADE, editable=False)
     group = models.ForeignKey(ScheduleGroup, on_delete=models.CASCADE, null=False)
@@ -488,32 +559,26 @@ class Affiliation(models.Model):
 
         cleaning_weeks = cleaning_weeks.filter(week__gte=current_epoch_week() + 1)
 
-        cleaning_weeks_invalidated = None
-
         if affiliation_pk is None or prev_beginning is None or prev_end is None or prev_group != new_group:
-            cleaning_weeks_invalidated = cleaning_weeks. \
-                filter(week__range=(new_beginning, new_end))
+            weeks_invalidated = Q(week__range=(new_beginning, new_end))
 
         elif prev_beginning != new_beginning or prev_end != new_end:
 
             min_beginning = min(prev_beginning, new_beginning)
             max_beginning = max(prev_beginning, new_beginning)
-            beginning_affects = cleaning_weeks. \
-                filter(week__range=(min_beginning, max_beginning)). \
-                exclude(week=max_beginning)
+            beginning_affects = Q(week__gte=min_beginning, week__lt=max_beginning)
 
             min_end = min(prev_end, new_end)
             max_end = max(prev_end, new_end)
-            end_affects = cleaning_weeks. \
-                filter(week__range=(min_end, max_end)). \
-                exclude(week=min_end)
+            end_affects = Q(week__gt=min_end, week__lte=max_end)
 
-            # XORing both sets deals with the case that the old and new affiliation week ranges don't overlap
-            cleaning_weeks_invalidated = set(beginning_affects) ^ set(end_affects)
+            # XORing both ranges deals with the case that the old and new affiliation week ranges don't overlap
+            weeks_invalidated = (beginning_affects & ~end_affects) | (end_affects & ~beginning_affects)
 
-        if cleaning_weeks_invalidated is not None:
-            for cleaning_week in cleaning_weeks_invalidated:
-                cleaning_week.set_assignments_valid_field(False)
+        else:
+            return
+
+        cleaning_weeks.filter(weeks_invalidated).update(assignments_valid=False)
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         self.date_validator(affiliation_pk=self.pk, cleaner=self.cleaner, beginning=self.beginning, end=self.end)
@@ -523,6 +588,7 @@ class Affiliation(models.Model):
             new_beginning=self.beginning, new_end=self.end)
         super().save(force_insert, force_update, using, update_fields)
         self.update_previous()
+        self.cleaner.forget_affiliations()
 
     def delete(self, using=None, keep_parents=False):
         self.cleaning_week_assignments_invalidator(
@@ -530,6 +596,7 @@ class Affiliation(models.Model):
             prev_beginning=self.beginning, prev_end=self.end,
             new_beginning=self.beginning, new_end=self.end)
         super().delete(using, keep_parents)
+        self.cleaner.forget_affiliations()
 
 
 class CleaningWeekQuerySet(models.QuerySet):
@@ -577,41 +644,46 @@ class CleaningWeek(models.Model):
     def is_current_week(self) -> bool:
         return current_epoch_week() == self.week
 
-    def tasks_are_ready_to_be_done(self):
-        for task in self.task_set.all():
-            if task.my_time_has_come() and task.cleaned_by is None:
+    def tasks_are_ready_to_be_done(self, today=None):
+        if today is None:
+            today = timezone.now().date()
+        for task in self.task_set.select_related('template'):
+            if task.my_time_has_come(today=today) and task.cleaned_by_id is None:
                 return True
         return False
 
     def task_templates_missing(self):
-        return self.schedule.tasktemplate_set.all().exclude(pk__in=[x.template.pk for x in self.task_set.all()])
+        return self.schedule.tasktemplate_set.exclude(pk__in=self.task_set.values('template'))
 
     def create_missing_tasks(self):
-        missing_task_templates = self.task_templates_missing()
-        for task_template in missing_task_templates.all():
-            self.task_set.create(template=task_template)
-        self.save()
+        Task.objects.bulk_create([Task(cleaning_week=self, template=task_template)
+                                  for task_template in self.task_templates_missing()])
 
     def completed_tasks(self) -> QuerySet:
         return self.task_set.exclude(cleaned_by__isnull=True)
 
     def completed_tasks__as_templates(self) -> list:
-        return [x.template for x in self.completed_tasks()]
+        return [x.template for x in self.completed_tasks().select_related('template')]
 
     def open_tasks(self) -> QuerySet:
         return self.task_set.filter(cleaned_by__isnull=True)
 
     def open_tasks__as_templates(self) -> QuerySet:
-        return TaskTemplate.objects.filter(pk__in=[x.template.pk for x in self.open_tasks()])
+        return TaskTemplate.objects.filter(pk__in=self.open_tasks().values('template'))
 
     def ratio_of_completed_tasks(self) -> float:
-        return self.completed_tasks().count() / self.task_set.count()
+        task_counts = self.task_set.aggregate(all=Count('pk'),
+                                              completed=Count('pk', filter=Q(cleaned_by__isnull=False)))
+        if task_counts['all'] != 0:
+            return task_counts['completed'] / task_counts['all']
+        else:
+            return 0.0
 
     def all_tasks_are_completed(self):
         return self.ratio_of_completed_tasks() == 1.0
 
     def assigned_cleaners(self) -> QuerySet:
-        return Cleaner.objects.filter(pk__in=[x.cleaner.pk for x in self.assignment_set.all()])
+        return Cleaner.objects.filter(pk__in=self.assignment_set.values('cleaner'))
 
     def is_in_future(self) -> bool:
         return current_epoch_week() < self.week
@@ -624,7 +696,7 @@ class CleaningWeek(models.Model):
 
     def set_assignments_valid_field(self, value: bool) -> None:
         self.assignments_valid = value
-        self.save()
+        self.save(update_fields=['assignments_valid'])
 
 
 class AssignmentQuerySet(models.QuerySet):
@@ -638,7 +710,7 @@ class AssignmentQuerySet(models.QuerySet):
 class Assignment(models.Model):
     cleaner = models.ForeignKey(Cleaner, on_delete=models.CASCADE)
     cleaners_comment = models.CharField(max_length=200)
-    created = models.DateField(auto_now_add=timezone.now().date(), editable=False)
+    created = models.DateField(auto_now_add=True, editable=False)
 
     cleaning_week = models.ForeignKey(CleaningWeek, on_delete=models.CASCADE, editable=False)
     schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, editable=False)
@@ -647,6 +719,8 @@ class Assignment(models.Model):
 
     class Meta:
         ordering = ('cleaning_week__week', 'schedule__weekday')
+        indexes = [models.Index(fields=['schedule', 'cleaning_week']),
+                   models.Index(fields=['cleaning_week', 'cleaner'])]
 
     def __str__(self):
         return "{}: {}, {} ".format(
@@ -655,13 +729,15 @@ class Assignment(models.Model):
     def assignment_date(self):
         return self.cleaning_week.assignment_date()
 
-    def tasks_are_ready_to_be_done(self):
-        return self.cleaning_week.tasks_are_ready_to_be_done()
+    def tasks_are_ready_to_be_done(self, today=None):
+        return self.cleaning_week.tasks_are_ready_to_be_done(today=today)
 
-    def has_passed(self):
+    def has_passed(self, today=None):
         # We check if tasks are not ready to be done because while the assignment_date may be in the past,
         # the Tasks can possibly be done a few days after that date
-        return self.assignment_date() < timezone.now().date() and not self.tasks_are_ready_to_be_done()
+        if today is None:
+            today = timezone.now().date()
+        return self.assignment_date() < today and not self.tasks_are_ready_to_be_done(today=today)
 
     def all_cleaners_in_week_for_schedule(self):
         return Cleaner.objects.filter(assignment__cleaning_week=self.cleaning_week)
@@ -670,11 +746,7 @@ class Assignment(models.Model):
         return self.all_cleaners_in_week_for_schedule().exclude(pk=self.cleaner.pk)
 
     def switch_requested(self):
-        duty_switch = DutySwitch.objects.filter(requester_assignment=self).filter(acceptor_assignment__isnull=True)
-        if duty_switch.exists():
-            return duty_switch.first()
-        else:
-            return None
+        return DutySwitch.objects.filter(requester_assignment=self).filter(acceptor_assignment__isnull=True).first()
 
 
 class TaskTemplate(models.Model):
@@ -693,10 +765,10 @@ class TaskTemplate(models.Model):
         return self.name
 
     def start_day_to_weekday(self):
-        return Schedule.WEEKDAYS[(self.schedule.weekday-self.start_days_before) % 7][1]
+        return WEEKDAY_NAMES[(self.schedule.weekday-self.start_days_before) % 7]
 
     def end_day_to_weekday(self):
-        return Schedule.WEEKDAYS[(self.schedule.weekday+self.end_days_after) % 7][1]
+        return WEEKDAY_NAMES[(self.schedule.weekday+self.end_days_after) % 7]
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
@@ -724,30 +796,30 @@ class Task(models.Model):
         return self.template.name
 
     def start_date(self):
-        return self.cleaning_week.week_start() \
-               + datetime.timedelta(days=self.cleaning_week.schedule.weekday) \
-               - datetime.timedelta(days=self.template.start_days_before)
+        return self.cleaning_week.assignment_date() - datetime.timedelta(days=self.template.start_days_before)
 
     def end_date(self):
-        return self.cleaning_week.week_start() \
-               + datetime.timedelta(days=self.cleaning_week.schedule.weekday) \
-               + datetime.timedelta(days=self.template.end_days_after)
+        return self.cleaning_week.assignment_date() + datetime.timedelta(days=self.template.end_days_after)
 
     def is_active_on_date(self, date):
         return self.start_date() <= date <= self.end_date()
 
-    def my_time_has_come(self):
-        return self.is_active_on_date(timezone.now().date())
+    def my_time_has_come(self, today=None):
+        if today is None:
+            today = timezone.now().date()
+        return self.is_active_on_date(today)
 
-    def has_passed(self):
-        return self.end_date() < timezone.now().date()
+    def has_passed(self, today=None):
+        if today is None:
+            today = timezone.now().date()
+        return self.end_date() < today
 
     def possible_cleaners(self):
         return self.cleaning_week.assigned_cleaners()
 
     def set_cleaned_by(self, cleaner: Cleaner):
         self.cleaned_by = cleaner
-        self.save()
+        self.save(update_fields=['cleaned_by'])
 
 
 class DutySwitchQuerySet(models.QuerySet):
@@ -776,7 +848,7 @@ class DutySwitchQuerySet(models.QuerySet):
 class DutySwitch(models.Model):
     class Meta:
         ordering = ('created',)
-    created = models.DateField(auto_now_add=timezone.now().date())
+    created = models.DateField(auto_now_add=True)
 
     requester_assignment = models.OneToOneField(Assignment, on_delete=models.CASCADE, related_name="requester",
                                                 editable=False)
@@ -825,8 +897,7 @@ class DutySwitch(models.Model):
         if not acceptor_weeks:
             acceptor_weeks = DutySwitch.default_acceptor_weeks(assignment)
 
-        active_affiliations = Affiliation.objects.active_in_week(assignment.cleaning_week.week)
-        active_cleaners = [x.cleaner for x in active_affiliations.all()]
+        active_cleaners = Affiliation.objects.active_in_week(assignment.cleaning_week.week).values('cleaner')
 
         p_a_set = Assignment.objects.in_enabled_cleaning_weeks()
         p_a_set = p_a_set.filter(schedule=assignment.schedule)
@@ -835,21 +906,20 @@ class DutySwitch(models.Model):
         p_a_set = p_a_set.exclude(cleaner=assignment.cleaner)
         p_a_set = p_a_set.exclude(cleaning_week__excluded=assignment.cleaner)
 
-        for could_have_passed in p_a_set.filter(
-                cleaning_week__week__range=(current_epoch_week() - 1, current_epoch_week())).all():
-            if could_have_passed.has_passed():
-                p_a_set = p_a_set.exclude(pk=could_have_passed.pk)
+        have_passed = [x.pk for x in p_a_set.filter(
+            cleaning_week__week__range=(current_epoch_week() - 1, current_epoch_week())).
+            select_related('schedule', 'cleaning_week') if x.has_passed()]
 
-        return p_a_set
+        return p_a_set.exclude(pk__in=have_passed)
 
     def possible_acceptors(self):
         return DutySwitch.possible_acceptors_of_assignment(self.requester_assignment, self.acceptor_weeks)
 
     def set_new_proposal(self):
         self.dont_propose.add(self.proposed_acceptor)
-        choices = set(self.possible_acceptors()) ^ set(self.dont_propose.all())
+        choices = list(self.possible_acceptors().exclude(pk__in=self.dont_propose.all()))
         if choices:
-            self.proposed_acceptor = random.choice(list(choices))
+            self.proposed_acceptor = random.choice(choices)
             self.execute_proposal = timezone.now().date() + timezone.timedelta(days=2)
             email_sending.send_email__dutyswitch_proposal(self)
         else:
@@ -875,9 +945,8 @@ class DutySwitch(models.Model):
             self.requester_assignment.save()
 
             # if there is an open DutySwitch with acceptor_assignment as the requester, we delete it
-            resolved_as_well = DutySwitch.objects.filter(requester_assignment=self.acceptor_assignment)
-            if resolved_as_well.exists():
-                resolved_as_well.delete()
+            nr_resolved_as_well, _ = DutySwitch.objects.filter(requester_assignment=self.acceptor_assignment).delete()
+            if nr_resolved_as_well:
                 # The acceptor wanted to get rid of his Assignment too, so we shall prevent him from getting one
                 # in the same week again!
                 self.acceptor_assignment.cleaning_week.excluded.add(self.acceptor_assignment.cleaner)
@@ -10,9 +10,7 @@ def schedule_group_changed(instance, action, model, pk_set, **kwargs):
             schedules = Schedule.objects.filter(pk__in=pk_set)
         else:
             schedules = Schedule.objects.filter(pk=instance.pk)
-        if schedules.exists():
-            for schedule in schedules.all():
-                [x.set_assignments_valid_field(False) for x in schedule.cleaningweek_set.in_future()]
+        CleaningWeek.objects.filter(schedule__in=schedules).in_future().update(assignments_valid=False)
     return
 
 
@@ -29,3 +29,27 @@ class EpochFunctionsTest(TestCase):
     def test__epoch_week_to_sunday(self):
         self.assertEqual(epoch_week_to_sunday(self.first_week['week_nr']), self.first_week['end'])
         self.assertEqual(epoch_week_to_sunday(self.second_week['week_nr']), self.second_week['end'])
+
+    def test__date_to_epoch_week__matches_timestamp_calculation(self):
+        for date in (self.second_week['start'] + datetime.timedelta(days=x) for x in range(0, 30000, 13)):
+            epoch_days = (date - datetime.date(1970, 1, 1)).days
+            self.assertEqual(date_to_epoch_week(date), int((epoch_days + 3) / 7))
+
+    def test__epoch_week_to_monday_and_sunday__match_timestamp_calculation(self):
+        for week in range(-100, 5000, 7):
+            epoch = datetime.date(1970, 1, 1)
+            self.assertEqual(epoch_week_to_monday(week), epoch + datetime.timedelta(days=week * 7 - 3))
+            self.assertEqual(epoch_week_to_sunday(week), epoch + datetime.timedelta(days=week * 7 + 3))
+            self.assertEqual(date_to_epoch_week(epoch_week_to_monday(week)), week)
+            self.assertEqual(date_to_epoch_week(epoch_week_to_sunday(week)), week)
+
+    def test__date_to_epoch_week__datetime(self):
+        self.assertEqual(date_to_epoch_week(datetime.datetime(1970, 1, 11, 23, 59)), self.second_week['week_nr'])
+
+    @patch('webinterface.models.datetime', autospec=True)
+    def test__current_epoch_week(self, mock_datetime):
+        mock_datetime.date.today.return_value = self.second_week['end']
+        self.assertEqual(current_epoch_week(), self.second_week['week_nr'])
+
+        mock_datetime.date.today.return_value = self.second_week['end'] + datetime.timedelta(days=1)
+        self.assertEqual(current_epoch_week(), self.second_week['week_nr'] + 1)
@@ -92,10 +92,8 @@ class AffiliationTest(TestCase):
     def test__end_as_date(self):
         self.assertEqual(self.affiliation.end_as_date(), epoch_week_to_sunday(self.end_week))
 
-    @patch('webinterface.models.CleaningWeek.set_assignments_valid_field', autospec=True)
     @patch('webinterface.models.current_epoch_week', autospec=True)
-    def test__affiliation_time_frame_change_in_past_doesnt_invalidate(
-            self, mock_current_epoch_week, mock_set_assignments_valid):
+    def test__affiliation_time_frame_change_in_past_doesnt_invalidate(self, mock_current_epoch_week):
         mock_current_epoch_week.return_value = self.current_week
 
         Affiliation.cleaning_week_assignments_invalidator(
@@ -104,22 +102,16 @@ class AffiliationTest(TestCase):
             new_beginning=self.start_week + 1, new_end=self.start_week + 3
         )
 
-        self.assertListEqual(mock_set_assignments_valid.call_args_list, [])
+        self.assertFalse(CleaningWeek.objects.assignments_invalid().exists())
 
-    def assert_future_cleaning_weeks_are_invalidated(
-            self, schedule: Schedule, call_args_list: list, expected_weeks: set):
-        call_tuples = tuple(x[0] for x in call_args_list)
-        self.assertFalse(any([x[1] for x in call_tuples]))
-
-        cleaning_week_pks = [x[0].pk for x in call_tuples]
-        cleaning_weeks = schedule.cleaningweek_set.filter(pk__in=cleaning_week_pks)
+    def assert_future_cleaning_weeks_are_invalidated(self, schedule: Schedule, expected_weeks: set):
+        cleaning_weeks = schedule.cleaningweek_set.assignments_invalid()
 
         self.assertFalse(cleaning_weeks.filter(week__lte=self.current_week).exists())
         self.assertSetEqual(set(x.week for x in cleaning_weeks.all()), expected_weeks)
 
-    @patch('webinterface.models.CleaningWeek.set_assignments_valid_field', autospec=True)
     @patch('webinterface.models.current_epoch_week', autospec=True)
-    def run_assignments_invalidator(self, mock_current_epoch_week, mock_set_assignments_valid,
+    def run_assignments_invalidator(self, mock_current_epoch_week,
                                     affiliation_pk, prev_group, new_group,
                                     prev_beginning, new_beginning, prev_end, new_end):
         mock_current_epoch_week.return_value = self.current_week
@@ -129,53 +121,63 @@ class AffiliationTest(TestCase):
             new_beginning=new_beginning, new_end=new_end
         )
 
-        return mock_set_assignments_valid.call_args_list
-
     def test__affiliation_time_frame_change_in_future_invalidates(self):
-        call_args_list = self.run_assignments_invalidator(
+        self.run_assignments_invalidator(
             affiliation_pk=self.affiliation.pk, prev_group=self.group, new_group=self.group,
             prev_beginning=self.start_week, prev_end=self.start_week + 3,
             new_beginning=self.start_week, new_end=self.start_week + 1
         )
         self.assert_future_cleaning_weeks_are_invalidated(
-            schedule=self.schedule, call_args_list=call_args_list,
+            schedule=self.schedule,
             expected_weeks=set(x for x in range(self.current_week + 1, self.start_week + 4))
         )
 
+    def test__affiliation_time_frame_moved_invalidates_old_and_new_weeks(self):
+        self.run_assignments_invalidator(
+            affiliation_pk=self.affiliation.pk, prev_group=self.group, new_group=self.group,
+            prev_beginning=self.start_week, prev_end=self.start_week + 3,
+            new_beginning=self.start_week + 5, new_end=self.start_week + 8
+        )
+        self.assert_future_cleaning_weeks_are_invalidated(
+            schedule=self.schedule,
+            expected_weeks={self.start_week + 2, self.start_week + 3}.union(
+                range(self.start_week + 5, self.start_week + 9))
+        )
+
     def test__affiliation_group_change_invalidates(self):
-        call_args_list = self.run_assignments_invalidator(
+        self.run_assignments_invalidator(
             affiliation_pk=self.affiliation.pk, prev_group=self.group, new_group=self.group2,
             prev_beginning=self.start_week, prev_end=self.start_week + 3,
             new_beginning=self.start_week, new_end=self.start_week + 3
         )
         self.assert_future_cleaning_weeks_are_invalidated(
-            schedule=self.schedule, call_args_list=call_args_list,
+            schedule=self.schedule,
             expected_weeks=set(x for x in range(self.current_week + 1, self.start_week + 4))
         )
         self.assert_future_cleaning_weeks_are_invalidated(
-            schedule=self.schedule2, call_args_list=call_args_list,
+            schedule=self.schedule2,
             expected_weeks=set(x for x in range(self.current_week + 1, self.start_week + 4))
         )
 
     def test__affiliation_creation_invalidates(self):
-        call_args_list = self.run_assignments_invalidator(
+        self.run_assignments_invalidator(
             affiliation_pk=None, prev_group=None, new_group=self.group,
             prev_beginning=None, prev_end=None,
             new_beginning=self.start_week, new_end=self.start_week + 3
         )
         self.assert_future_cleaning_weeks_are_invalidated(
-            schedule=self.schedule, call_args_list=call_args_list,
+            schedule=self.schedule,
             expected_weeks=set(x for x in range(self.current_week + 1, self.start_week + 4))
         )
 
     def test__affiliation_deletion_invalidates(self):
-        call_args_list = self.run_assignments_invalidator(
+        self.run_assignments_invalidator(
             affiliation_pk=None, prev_group=self.group, new_group=self.group,
             prev_beginning=self.start_week, prev_end=self.start_week + 3,
             new_beginning=self.start_week, new_end=self.start_week + 3
         )
         self.assert_future_cleaning_weeks_are_invalidated(
-            schedule=self.schedule, call_args_list=call_args_list,
+            schedule=self.schedule,
             expected_weeks=set(x for x in range(self.current_week + 1, self.start_week + 4))
         )
 
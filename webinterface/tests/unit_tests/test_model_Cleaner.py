@@ -29,6 +29,44 @@ class CleanerTest(BaseFixtureWithDutySwitch, TestCase):
         mock_current_epoch_week.return_value = self.start_week-1
         self.assertFalse(self.angie.is_active())
 
+    def test__affiliation_in_week(self):
+        self.assertEqual(self.bob.affiliation_in_week(self.start_week), self.bob_affiliation_1)
+        self.assertEqual(self.bob.affiliation_in_week(self.mid_week), self.bob_affiliation_1)
+        self.assertEqual(self.bob.affiliation_in_week(self.mid_week + 1), self.bob_affiliation_2)
+        self.assertIsNone(self.bob.affiliation_in_week(self.start_week - 1))
+        self.assertIsNone(self.bob.affiliation_in_week(self.end_week + 1))
+
+    def test__affiliation_in_week__after_affiliation_changes(self):
+        cleaner = Cleaner.objects.create(name='eric')
+        self.assertIsNone(cleaner.affiliation_in_week(self.start_week))
+
+        affiliation = Affiliation.objects.create(cleaner=cleaner, group=self.upper_group,
+                                                 beginning=self.start_week, end=self.end_week)
+        self.assertEqual(cleaner.affiliation_in_week(self.start_week), affiliation)
+
+        affiliation.delete()
+        self.assertIsNone(cleaner.affiliation_in_week(self.start_week))
+
+    def test__affiliation_in_week__prefetched(self):
+        bob = Cleaner.objects.prefetch_related('affiliation_set').get(pk=self.bob.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(bob.affiliation_in_week(self.mid_week), self.bob_affiliation_1)
+            self.assertEqual(bob.affiliation_in_week(self.mid_week + 1), self.bob_affiliation_2)
+            self.assertIsNone(bob.affiliation_in_week(self.end_week + 1))
+
+    @patch('webinterface.models.current_epoch_week', autospec=True)
+    def test__is_active__after_affiliation_changed_through_other_instance(self, mock_current_epoch_week):
+        mock_current_epoch_week.return_value = self.start_week
+        cleaner = Cleaner.objects.create(name='eric')
+        affiliation = Affiliation.objects.create(cleaner=cleaner, group=self.upper_group,
+                                                 beginning=self.start_week - 5, end=self.end_week)
+        self.assertTrue(cleaner.is_active())
+
+        affiliation = Affiliation.objects.get(pk=affiliation.pk)
+        affiliation.end = self.start_week - 1
+        affiliation.save()
+        self.assertFalse(cleaner.is_active())
+
     def test__deployment_ratio(self):
         self.assertEqual(self.angie.deployment_ratio(self.bathroom_schedule, self.start_week, self.start_week+1),
                          1.0)
@@ -87,6 +125,21 @@ class CleanerTest(BaseFixtureWithDutySwitch, TestCase):
         self.assertEqual(Cleaner.objects.get(name='dave').slug, 'dave')
         self.assertTrue(User.objects.filter(username=Cleaner.objects.get(name='dave').slug).exists())
 
+    def test__save__name_change_changes_password(self):
+        dave = Cleaner.objects.get(name='dave')
+        dave.name = 'eric'
+        dave.save()
+
+        self.assertTrue(User.objects.get(username='eric').check_password('eric'))
+
+    @patch('django.contrib.auth.models.User.set_password', autospec=True)
+    def test__save__without_name_change_leaves_user_untouched(self, mock_set_password):
+        dave = Cleaner.objects.get(name='dave')
+        dave.time_zone = 'Europe/London'
+        dave.save()
+
+        self.assertFalse(mock_set_password.called)
+
     def test__save_and_delete(self):
         cleaner = Cleaner.objects.create(name='eric')
 
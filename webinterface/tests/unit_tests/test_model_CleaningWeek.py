@@ -101,13 +101,14 @@ class CleaningWeekTest(TestCase):
         self.assertListEqual(list(self.cw1.task_templates_missing()),
                              [self.task_template_3])
 
-    @patch('django.db.models.query.QuerySet.create', autospec=True)
-    @patch('webinterface.models.CleaningWeek.save', autospec=True)
-    def test__create_missing_tasks(self, mock_cleaning_week_save, mock_queryset_create):
+    @patch('django.db.models.query.QuerySet.bulk_create', autospec=True)
+    def test__create_missing_tasks(self, mock_queryset_bulk_create):
         self.cw1.create_missing_tasks()
 
-        self.assertEqual(mock_queryset_create.call_count, 1)
-        self.assertEqual(mock_queryset_create.call_args[1]['template'], self.task_template_3)
+        self.assertEqual(mock_queryset_bulk_create.call_count, 1)
+        created_tasks = mock_queryset_bulk_create.call_args[0][1]
+        self.assertListEqual([(x.cleaning_week, x.template) for x in created_tasks],
+                             [(self.cw1, self.task_template_3)])
 
     def test__completed_tasks(self):
         self.assertSetEqual(set(self.cw1.completed_tasks()), {self.task2_cw1})
@@ -127,6 +128,10 @@ class CleaningWeekTest(TestCase):
     def test__ratio_of_completed_tasks__all_are_done(self):
         self.assertEqual(self.cw2.ratio_of_completed_tasks(), 1.0)
 
+    def test__ratio_of_completed_tasks__no_tasks(self):
+        cleaning_week = CleaningWeek.objects.create(week=self.start_week + 2, schedule=self.schedule)
+        self.assertEqual(cleaning_week.ratio_of_completed_tasks(), 0.0)
+
     def test__all_tasks_are_completed__false(self):
         self.assertFalse(self.cw1.all_tasks_are_completed())
 
@@ -150,3 +150,16 @@ class DutySwitchDatabaseTests(TestCase):
         self.assertIn(proposed, dutyswitch.dont_propose.all())
         self.assertNotEqual(proposed, new_proposed)
         self.assertIsNone(dutyswitch.proposed_acceptor)
+
+    @patch('webinterface.email_sending.send_email__dutyswitch_proposal', autospec=True, return_value=True)
+    @patch('webinterface.models.DutySwitch.possible_acceptors', autospec=True)
+    def test__set_new_proposal__dont_propose_outside_of_possible_acceptors(self, mock_possible_acceptors,
+                                                                           mock_send_email):
+        mock_possible_acceptors.return_value = Assignment.objects.filter(pk=self.assignment1.pk)
+        dutyswitch = DutySwitch.objects.get(pk=self.dutyswitch.pk)
+        # assignment2 was rejected before and is no longer a possible acceptor, so it must never be proposed
+        dutyswitch.dont_propose.add(self.assignment2)
+
+        self.assertEqual(dutyswitch.set_new_proposal(), self.assignment1)
+        self.assertIsNone(dutyswitch.set_new_proposal())
+        self.assertIsNone(DutySwitch.objects.get(pk=self.dutyswitch.pk).proposed_acceptor)
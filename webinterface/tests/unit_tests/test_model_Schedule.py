@@ -56,13 +56,37 @@ class ScheduleTest(BaseFixture, TestCase):
         self.assertDictEqual(self.garage_schedule.constant_affiliation_timespan(self.start_week+3),
                              {'beginning': self.start_week+2, 'end': self.start_week+3})
 
-    @patch('webinterface.models.Cleaner.deployment_ratio', autospec=True)
     @patch('webinterface.models.Schedule.constant_affiliation_timespan', autospec=True)
-    def test__deployment_ratios_are_sorted_and_correct_cleaners_are_selected(self, mock_timespan, mock_ratio):
+    def test__deployment_ratios_are_sorted_and_correct_cleaners_are_selected(self, mock_timespan):
         mock_timespan.return_value = {'beginning': self.start_week, 'end': self.end_week}
-        mock_ratio.side_effect = [0.5, 0.3]
         result = self.bathroom_schedule.deployment_ratios(self.start_week)
-        self.assertListEqual([[self.bob, 0.3], [self.angie, 0.5]], result)
+        self.assertListEqual([[self.bob, 0.0], [self.angie, 0.75]], result)
+
+    @patch('webinterface.models.Schedule.constant_affiliation_timespan', autospec=True)
+    def test__deployment_ratios__no_assignments_in_timespan(self, mock_timespan):
+        mock_timespan.return_value = {'beginning': self.end_week + 1, 'end': self.end_week + 2}
+        result = self.bathroom_schedule.deployment_ratios(self.start_week)
+        self.assertListEqual([[self.angie, 0.0], [self.bob, 0.0]], result)
+
+    def test__deployment_ratios__from_prefetched_affiliations(self):
+        affiliations = list(Affiliation.objects.active_in_timespan_for_schedule(
+            self.start_week, self.end_week, self.bathroom_schedule))
+        for week in range(self.start_week - 1, self.end_week + 2):
+            self.assertCountEqual(self.bathroom_schedule.deployment_ratios(week, affiliations=affiliations),
+                                  self.bathroom_schedule.deployment_ratios(week))
+
+    def test__cleaners_to_choose_from__lowest_ratio(self):
+        ratios = [[self.angie, 0.5], [self.bob, 0.2], [self.chris, 0.2], [self.dave, 0.1]]
+        self.assertListEqual(cleaners_to_choose_from(ratios, {}, frozenset()), [self.dave])
+
+    def test__cleaners_to_choose_from__fewest_assignments_in_week(self):
+        ratios = [[self.angie, 0.5], [self.bob, 0.2], [self.chris, 0.2], [self.dave, 0.1]]
+        self.assertListEqual(cleaners_to_choose_from(ratios, {self.bob.pk: 1, self.dave.pk: 2}, {self.dave.pk}),
+                             [self.chris])
+
+    def test__cleaners_to_choose_from__all_are_excluded(self):
+        ratios = [[self.angie, 0.5], [self.bob, 0.2]]
+        self.assertListEqual(cleaners_to_choose_from(ratios, {}, {self.angie.pk, self.bob.pk}), [])
 
     def test__occurs_in_week(self):
         weekly_schedule = Schedule(frequency=1)
@@ -115,7 +139,7 @@ class ScheduleTest(BaseFixture, TestCase):
 
         mock_create.return_value = True
         mock_deployment_ratios.return_value = deployment_ratios
-        mock_excluded.all.return_value = excluded
+        mock_excluded.values_list.return_value = [x.pk for x in excluded]
 
         with self.assertLogs(logger=schedule.slug, level='DEBUG') as log:
             schedule.logger = logging.getLogger(schedule.slug)
@@ -204,6 +228,23 @@ class ScheduleModelDatabaseTests(TestCase):
         self.assertTrue(CleaningWeek.objects.get(pk=self.cleaning_week.pk).assignments_valid)
         self.assertTrue(CleaningWeek.objects.get(pk=self.cleaning_week_in_wrong_week.pk).assignments_valid)
 
+    def test__create_assignments_over_timespan__same_seed_same_assignments(self):
+        group = ScheduleGroup.objects.create(name="group")
+        group.schedules.add(self.schedule)
+        for name in ("angie", "bob", "chris"):
+            Affiliation.objects.create(cleaner=Cleaner.objects.create(name=name), group=group,
+                                       beginning=self.week, end=self.week + 20)
+
+        def assigned_cleaners(seed):
+            self.schedule.assignment_set.all().delete()
+            self.schedule.cleaningweek_set.update(assignments_valid=True)
+            self.schedule.create_assignments_over_timespan(self.week + 2, self.week + 20, seed=seed)
+            return sorted(self.schedule.assignment_set.values_list('cleaning_week__week', 'cleaner__name'))
+
+        first_run = assigned_cleaners(seed=42)
+        self.assertTrue(first_run)
+        self.assertListEqual(first_run, assigned_cleaners(seed=42))
+
     def test__future_cleaning_weeks_invalidated_on_cleaners_per_date_change(self):
         self.invalidation_test_runner(field_name='cleaners_per_date', new_value=2)
 
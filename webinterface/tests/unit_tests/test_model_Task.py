@@ -72,6 +72,14 @@ class TaskTest(BaseFixtureWithTasks, TestCase):
         self.assertTrue(task1.has_passed())
         self.assertFalse(task2.has_passed())
 
+    def test__has_passed__given_today(self):
+        cw = self.bathroom_schedule.cleaningweek_set.get(week=self.start_week)
+        task1 = cw.task_set.get(template=self.bathroom_task_template_1)  # Can only be done 2 days after assignment_date
+
+        self.assertFalse(task1.has_passed(today=cw.assignment_date() + datetime.timedelta(days=2)))
+        self.assertTrue(task1.has_passed(today=cw.assignment_date() + datetime.timedelta(days=3)))
+        self.assertTrue(task1.my_time_has_come(today=cw.assignment_date()))
+
     def test__possible_cleaners(self):
         self.assertListEqual(list(self.task_bathroom_2500_1.possible_cleaners()), [self.angie])
         self.assertListEqual(list(self.task_bathroom_2503_1.possible_cleaners()), [self.chris])
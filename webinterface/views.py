@@ -1,8 +1,6 @@
-import plotly.offline as opy
-import plotly.graph_objs as go
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
-from django.http import HttpResponseRedirect, HttpResponseForbidden
+from django.http import HttpResponseRedirect
 from django.contrib.auth.views import LoginView
 from django.views.generic import TemplateView
 from django.http import Http404
@@ -12,6 +10,7 @@ from django.shortcuts import get_object_or_404
 from webinterface.models import *
 from cleansys import settings
 import markdown
+from functools import lru_cache
 
 
 def back_button_page_context(kwargs: dict) -> dict:
@@ -36,6 +35,10 @@ def create_cleaner_analytics(weeks_into_past=20, weeks_into_future=20, recreate=
     :param recreate: If False, only missing plots will be created
     :return: None
     """
+    # plotly takes a while to import and is only needed here, so we don't import it on every start-up
+    import plotly.offline as opy
+    import plotly.graph_objs as go
+
     # Cleaner analytics plots
     if recreate or not os.path.isfile(settings.CLEANER_ANALYTICS_FILE):
         weeks = set(x['week'] for x in CleaningWeek.objects.filter(
@@ -75,6 +78,9 @@ def create_schedule_analytics(weeks_into_past=20, weeks_into_future=20, only=Non
     :param recreate: If False, only missing plots will be created
     :return: None
     """
+    import plotly.offline as opy
+    import plotly.graph_objs as go
+
     for schedule in Schedule.objects.enabled():
         if only is not None and schedule.analytics_plot_path() not in only:
             continue
@@ -87,9 +93,14 @@ def create_schedule_analytics(weeks_into_past=20, weeks_into_future=20, only=Non
                              current_epoch_week() + weeks_into_future)).values("week")]
         weeks.sort()
 
+        if weeks:
+            affiliations = list(Affiliation.objects.active_in_timespan_for_schedule(weeks[0], weeks[-1], schedule))
+        else:
+            affiliations = []
+
         data = {}
         for week in weeks:
-            cleaners__ratios = schedule.deployment_ratios(week=week)
+            cleaners__ratios = schedule.deployment_ratios(week=week, affiliations=affiliations)
             for cleaner, ratio in cleaners__ratios:
                 if cleaner.name not in data:
                     data[cleaner.name] = {'weeks': [], 'ratios': []}
@@ -119,6 +130,41 @@ def create_schedule_analytics(weeks_into_past=20, weeks_into_future=20, only=Non
             file.write(plot_html)
 
 
+@lru_cache(maxsize=8)
+def render_markdown_file(markdown_file_path: str, create_toc: bool, toc_depth: str, modified: float) -> str:
+    """
+    Converts a markdown file to HTML. The result is memoized, so the file is only converted again once it
+    has been modified.
+
+    :param markdown_file_path: Path to the markdown file
+    :param create_toc: If True, a table of contents is prepended to the content
+    :param toc_depth: Headings up to this level are included in the table of contents, e.g. '###'
+    :param modified: Modification time of the file, only used to invalidate the memoized result
+    :return: HTML string
+    """
+    with open(markdown_file_path, 'r', encoding="utf-8") as file:
+        if create_toc:
+            content = []
+            toc = []
+            link_pk = 0
+            for line in file:
+                for i in range(1, len(toc_depth) + 1):
+                    if len(line) > i+1 and line[:i+1] == '#' * i + ' ':
+                        link_name = line[i+1:].replace('\n', '')
+                        link_pk += 1
+                        link_id = '{}_{}'.format(str(link_pk), slugify(link_name))
+                        content.append('<a id="{}"></a>\n'.format(link_id))
+                        toc.append('{}- [{}](#{})\n'.format('    '*(i-1), link_name, link_id))
+                        break
+                content.append(line)
+
+            content = toc + content
+            content = ''.join(content)
+        else:
+            content = file.read()
+    return markdown.markdown(text=content, output_format='html5')
+
+
 class MarkdownView(TemplateView):
     template_name = 'webinterface/markdown_view.html'
     markdown_file_path = ''
@@ -129,27 +175,8 @@ class MarkdownView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['title'] = self.title
-        with open(self.markdown_file_path, 'r', encoding="utf-8") as file:
-            if self.create_toc:
-                content = []
-                toc = []
-                link_pk = 0
-                for line in file:
-                    for i in range(1, len(self.toc_depth) + 1):
-                        if len(line) > i+1 and line[:i+1] == '#' * i + ' ':
-                            link_name = line[i+1:].replace('\n', '')
-                            link_pk += 1
-                            link_id = '{}_{}'.format(str(link_pk), slugify(link_name))
-                            content.append('<a id="{}"></a>\n'.format(link_id))
-                            toc.append('{}- [{}](#{})\n'.format('    '*(i-1), link_name, link_id))
-                            break
-                    content.append(line)
-
-                content = toc + content
-                content = ''.join(content)
-            else:
-                content = file.read()
-            context['content'] = markdown.markdown(text=content, output_format='html5')
+        context['content'] = render_markdown_file(self.markdown_file_path, self.create_toc, self.toc_depth,
+                                                  os.path.getmtime(self.markdown_file_path))
         return context
 
 
@@ -187,7 +214,7 @@ class AdminView(TemplateView):
         # webinterface_snippets/cleaner_panel.html needs to cover the same cases!
         context['action_needed_cleaners'] = \
             set(Cleaner.objects.filter(affiliation__isnull=True)) | \
-            set(x for x in Cleaner.objects.all() if x.is_homeless_soon())
+            set(x for x in Cleaner.objects.prefetch_related('affiliation_set') if x.is_homeless_soon())
         action_needed_cleaner_pks = [x.pk for x in context['action_needed_cleaners']]
         context['active_cleaner_list'] = Cleaner.objects.active().exclude(pk__in=action_needed_cleaner_pks)
         context['inactive_cleaner_list'] = Cleaner.objects.inactive().exclude(pk__in=action_needed_cleaner_pks)
@@ -349,15 +376,23 @@ class CleanerCalendarView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        assignments = self.cleaner.assignment_set.in_week_or_later(week=current_epoch_week()-1)
+        assignments = self.cleaner.assignment_set.in_week_or_later(week=current_epoch_week()-1).\
+            select_related('cleaning_week__schedule')
         assignments = list(assignments)
 
         context['calendar_header'] = ['Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So']
         context['calendar_rows'] = []
 
         all_tasks = Task.objects.filter(cleaning_week__in=[x.cleaning_week for x in assignments],
-                                        cleaned_by__isnull=True)
+                                        cleaned_by__isnull=True).select_related('cleaning_week__schedule', 'template')
+        # The dates are looked at for every day of the calendar, so they are only computed once per Task
+        task_date_ranges = [(x.start_date(), x.end_date()) for x in all_tasks]
         if len(assignments) >= 1:
+            today = timezone.now().date()
+            assignments_by_date = {}
+            for assignment in assignments:
+                assignments_by_date.setdefault(assignment.assignment_date(), []).append(assignment)
+
             for week in range(min(current_epoch_week(), assignments[0].cleaning_week.week),
                               assignments[-1].cleaning_week.week):
                 monday = epoch_week_to_monday(week)
@@ -366,10 +401,10 @@ class CleanerCalendarView(TemplateView):
                     day = monday + timezone.timedelta(days=weekday)
                     day_data = {
                         'date': day.strftime("%d.%m."),
-                        'is_today': timezone.now().date() == day,
+                        'is_today': today == day,
                         'equiv_page': CleanerView.paginate_by,
-                        'assignments': [x for x in assignments if x.assignment_date() == day],
-                        'task_ready': any(x.is_active_on_date(day) for x in all_tasks)
+                        'assignments': assignments_by_date.get(day, []),
+                        'task_ready': any(start <= day <= end for start, end in task_date_ranges)
                     }
                     columns.append(day_data)
                 context['calendar_rows'].append(columns)
@@ -407,17 +442,15 @@ class AssignmentTasksView(TemplateView):
             raise Exception("CleaningWeek does not exist on date!")
         context['cleaning_week'] = cleaning_week
         context['schedule'] = cleaning_week.schedule
-        context['tasks'] = cleaning_week.task_set.order_by('-template__end_days_after')
+        context['tasks'] = cleaning_week.task_set.order_by('-template__end_days_after').\
+            select_related('template', 'cleaned_by')
 
         if not context['view'].request.user.is_superuser:
             context['cleaner'] = context['view'].request.user.cleaner
             context['assignment'] = context['cleaner'].assignment_in_cleaning_week(cleaning_week)
         else:
             context['cleaner'] = None
-            if cleaning_week.assignment_set.exists():
-                context['assignment'] = cleaning_week.assignment_set.first()
-            else:
-                context['assignment'] = None
+            context['assignment'] = cleaning_week.assignment_set.first()
         return context
 
 